@@ -248,6 +248,7 @@ class Eigenvalues(EigVals):
         detrend: bool = False,
         outlier_tol: float = 0.1,
         show_progress: bool = False,
+        cpus: Optional[int] = 1,
     ) -> TrimReport:
         """Compute multiple trim regions iteratively via histogram-based outlier
         detection, perform unfolding for each trim region, and summarize the
@@ -292,6 +293,11 @@ class Eigenvalues(EigVals):
             [HBOS](https://pyod.readthedocs.io/en/latest/pyod.models.html#module-pyod.models.hbos)
             histogram-based outlier detection
 
+        cpus: int
+            Number of processes used to fit the smoothers to the distinct trims. The
+            default of 1 fits serially. If None, uses all available cpus. Only worth
+            raising when there are many trims and smoothers, since starting the
+            process pool is not free.
 
         Returns
         -------
@@ -313,6 +319,7 @@ class Eigenvalues(EigVals):
             detrend=detrend,
             outlier_tol=outlier_tol,
             show_progress=show_progress,
+            cpus=cpus,
         )
 
     def get_best_trimmed(
@@ -12,7 +12,6 @@ from numpy import ndarray
 from pathlib import Path
 from scipy.integrate import quad
 from scipy.special import sici
-from scipy.stats import trim_mean
 from statsmodels.nonparametric.kde import KDEUnivariate as KDE
 from typing import Any, List, Optional, Tuple, Union
 from typing_extensions import Literal
@@ -1060,8 +1059,7 @@ def _plot_trim_iters(
     fig, axes = plt.subplots(height, width)
     for trim, ax in zip(trims, axes.flat):
         start, end = trim.trim_indices
-        mean = float(trim_mean(trim.spacings.mean(), 0.2))
-        var = float(trim_mean(trim.spacings.var(ddof=1), 0.2))
+        mean, var = trim.mean_spacing, trim.var_spacing
         cut = trim.percent_removed
         subtitle = "No trim" if trim.id == 0 else "{:.2f}% removed".format(cut)
         info = "<s> {:.4f} var(s) {:.4f}".format(mean, var)
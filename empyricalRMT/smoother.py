@@ -1,10 +1,12 @@
 import numpy as np
 import pandas as pd
 
+from functools import lru_cache
 from numpy import ndarray
 from numpy.polynomial.polynomial import polyfit, polyval
 from pandas import DataFrame
 from scipy.interpolate import UnivariateSpline as USpline
+from scipy.linalg import solve_triangular
 from scipy.optimize import curve_fit
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from typing_extensions import Literal
@@ -31,6 +33,68 @@ def _spline_name(i: int) -> str:
     return SPLINE_DICT[i] if SPLINE_DICT.get(i) is not None else f"deg{i}"
 
 
+@lru_cache(maxsize=None)
+def _smoother_names(
+    poly_degrees: Tuple[int, ...],
+    spline_smooths: Union[str, Tuple[float, ...]],
+    spline_degrees: Tuple[int, ...],
+    gompertz: bool,
+) -> Tuple[str, ...]:
+    """Generate the names (unique identifiers) for each smoother + smoother
+    parameters. These depend only on the smoother configuration, and not on any
+    eigenvalues, so are cached across calls."""
+    col_names = [f"poly_{d}" for d in poly_degrees]
+    if spline_smooths == "heuristic":
+        for s in DEFAULT_SPLINE_SMOOTHS:
+            for deg in spline_degrees:
+                col_name = f"{_spline_name(deg)}-spline_" "{:1.3f}_heuristic".format(s)
+                col_names.append(col_name)
+    else:
+        for s in spline_smooths:
+            for deg in spline_degrees:
+                col_name = f"{_spline_name(deg)}-spline_" "{:1.3f}".format(s)
+                col_names.append(col_name)
+    if gompertz:
+        col_names.append("gompertz")
+    return tuple(col_names)
+
+
+def _columns_to_array(columns: List[Any]) -> ndarray:
+    """Stack `columns` (equal-length 1D arrays, or scalars) into a single float64
+    array with one column (or, for scalars, entry) per element of `columns`."""
+    if len(columns) == 0:
+        return np.empty([0, 0], dtype=np.float64)
+    data = np.array(columns, dtype=np.float64)
+    # data.T is a view, and Fortran-ordered, so each column is contiguous
+    return data.T
+
+
+def _array_to_frame(data: ndarray, col_names: List[str]) -> DataFrame:
+    """Wrap `data` (from `_columns_to_array`) in a DataFrame without copying. 1D
+    `data` becomes a single-row frame."""
+    if len(col_names) == 0:
+        return pd.DataFrame()
+    if data.ndim == 1:
+        data = data[np.newaxis, :]
+    return pd.DataFrame(data=data, columns=col_names, copy=False)
+
+
+def _scaled_poly(
+    poly_coef: ndarray, center: float, half_width: float
+) -> Callable[[ndarray], ndarray]:
+    """Get the polynomial with coefficients `poly_coef` in the rescaled variable
+    (x - center) / half_width, as a function of x."""
+    return lambda x: polyval((x - center) / half_width, poly_coef)
+
+
+def _mean_sq_err(unfolded: ndarray, steps: ndarray) -> float:
+    """Compute the mean of (unfolded - steps)**2 with a single temporary array."""
+    sqe = np.empty_like(unfolded, dtype=np.float64)
+    np.subtract(unfolded, steps, out=sqe)
+    np.square(sqe, out=sqe)
+    return float(np.mean(sqe))
+
+
 class Smoother:
     def __init__(self, eigenvalues: ndarray):
         """Initialize a Smoother.
@@ -41,7 +105,8 @@ class Smoother:
             Eigenvalues for fitting to the step function.
         """
         try:
-            eigs = np.array(eigenvalues).ravel()
+            # no copy yet, since np.sort below copies anyway
+            eigs = np.asarray(eigenvalues, dtype=np.float64).ravel()
         except BaseException as e:
             raise ValueError("Could not convert eigenvalues into numpy array.") from e
         if len(eigs) != len(eigenvalues):
@@ -97,9 +162,9 @@ class Smoother:
         )
 
         if smoother == "poly":
-            poly_coef = polyfit(eigs, steps, degree)
-            unfolded = polyval(eigs, poly_coef)
-            func = lambda x: polyval(x, poly_coef) if return_callable else None
+            # same fitting procedure as `fit_all`, so that the two agree
+            [(unfolded, poly)] = self.__fit_polys([degree])
+            func = lambda x: poly(x) if return_callable else None
             if detrend:
                 unfolded = emd_detrend(unfolded)
             return unfolded, steps, func
@@ -186,71 +251,147 @@ class Smoother:
         smoother_map: dict
             A dict of {col_name: closure} for accessing the fitted smoothers later.
         """
-        # construct dataframes to hold all info
-        col_names, unfoldeds, spacings, sqes = [], [], [], []
-        smoother_map = {}
-        for d in poly_degrees:
-            col_name = f"poly_{d}"
-            unfolded, steps, closure = self.fit(
-                smoother="poly", degree=d, return_callable=True, detrend=detrend
-            )
-            col_names.append(col_name)
-            sqes.append(np.mean((unfolded - steps) ** 2))
-            unfolded = np.sort(unfolded)  # Important!
-            unfoldeds.append(unfolded)
-            spacings.append(np.diff(unfolded))
-            smoother_map[col_name] = closure
+        col_names, unfoldeds, spacings, sqes, smoother_map = self._fit_all_arrays(
+            poly_degrees=poly_degrees,
+            spline_smooths=spline_smooths,
+            spline_degrees=spline_degrees,
+            gompertz=gompertz,
+            detrend=detrend,
+        )
+        return (
+            _array_to_frame(unfoldeds, col_names),
+            _array_to_frame(spacings, col_names),
+            _array_to_frame(sqes, col_names),
+            smoother_map,
+        )
 
+    def _fit_all_arrays(
+        self,
+        poly_degrees: List[int] = [],
+        spline_smooths: SmoothArg = [],
+        spline_degrees: List[int] = DEFAULT_SPLINE_DEGREES,
+        gompertz: bool = False,
+        detrend: bool = False,
+    ) -> Tuple[List[str], ndarray, ndarray, ndarray, Dict[str, Callable]]:
+        """Same as `Smoother.fit_all`, but without building any DataFrames.
+
+        Returns
+        -------
+        col_names: List[str]
+            The names of the smoothers, in the order of the columns below.
+
+        unfoldeds: ndarray
+            The (sorted) unfolded eigenvalues, one column per smoother.
+
+        spacings: ndarray
+            The spacings of the unfolded eigenvalues, one column per smoother.
+
+        sqes: ndarray
+            The mean squared errors of the fits, one entry per smoother.
+
+        smoother_map: dict
+            A dict of {col_name: closure} for accessing the fitted smoothers later.
+        """
+        gompertz = bool(gompertz)  # e.g. np.bool_, so names and fits agree
+        # use the same (cached) names as the trim reports, rather than formatting them
+        # separately here, so that the two can't disagree
+        smooths = (
+            spline_smooths if spline_smooths == "heuristic" else tuple(spline_smooths)
+        )
+        col_names = list(
+            _smoother_names(
+                tuple(poly_degrees), smooths, tuple(spline_degrees), gompertz
+            )
+        )
+        fits = []  # (unfolded, closure) for each smoother, in the order of col_names
+        if len(poly_degrees) > 0:
+            for unfolded, closure in self.__fit_polys(poly_degrees):
+                if detrend:
+                    unfolded = emd_detrend(unfolded)
+                fits.append((unfolded, closure))
         if spline_smooths == "heuristic":
-            for s in DEFAULT_SPLINE_SMOOTHS:
-                for d in spline_degrees:
-                    col_name = f"{_spline_name(d)}-spline_" "{:1.2f}_heuristic".format(
-                        s
-                    )
-                    unfolded, steps, closure = self.fit(
-                        smoother="spline",
-                        spline_smooth=len(self._eigs) ** s,
-                        degree=d,
-                        return_callable=True,
-                        detrend=detrend,
-                    )
-                    col_names.append(col_name)
-                    sqes.append(np.mean((unfolded - steps) ** 2))
-                    unfolded = np.sort(unfolded)
-                    unfoldeds.append(unfolded)
-                    spacings.append(np.diff(unfolded))
-                    smoother_map[col_name] = closure
+            smooth_factors = [len(self._eigs) ** s for s in DEFAULT_SPLINE_SMOOTHS]
         else:
-            for s in spline_smooths:  # type: ignore
-                for d in spline_degrees:
-                    col_name = f"{_spline_name(d)}-spline_" "{:1.3f}".format(s)
-                    unfolded, steps, closure = self.fit(
-                        smoother="spline",
-                        spline_smooth=s,
-                        degree=d,
-                        return_callable=True,
-                        detrend=detrend,
-                    )
-                    col_names.append(col_name)
-                    sqes.append(np.mean((unfolded - steps) ** 2))
-                    unfolded = np.sort(unfolded)
-                    unfoldeds.append(unfolded)
-                    spacings.append(np.diff(unfolded))
-                    smoother_map[col_name] = closure
+            smooth_factors = list(spline_smooths)  # type: ignore
+        for s in smooth_factors:
+            for d in spline_degrees:
+                unfolded, _, closure = self.fit(
+                    smoother="spline",
+                    spline_smooth=s,
+                    degree=d,
+                    return_callable=True,
+                    detrend=detrend,
+                )
+                fits.append((unfolded, closure))
         if gompertz:
-            unfolded, steps, closure = self.fit(
+            unfolded, _, closure = self.fit(
                 smoother="gompertz", return_callable=True, detrend=detrend
             )
-            col_names.append("gompertz")
-            sqes.append(np.mean((unfolded - steps) ** 2))
-            unfolded = np.sort(unfolded)
+            fits.append((unfolded, closure))
+
+        unfoldeds, spacings, sqes = [], [], []
+        smoother_map = {}
+        steps = np.arange(0, len(self._eigs)) + 1
+        if len(fits) != len(col_names):
+            raise RuntimeError(
+                f"Fit {len(fits)} smoothers, but generated {len(col_names)} names."
+            )
+        for col_name, (unfolded, closure) in zip(col_names, fits):
+            sqes.append(_mean_sq_err(unfolded, steps))
+            unfolded = np.sort(unfolded)  # Important!
             unfoldeds.append(unfolded)
             spacings.append(np.diff(unfolded))
-            smoother_map["gompertz"] = closure
-        unfoldeds = pd.DataFrame(data=unfoldeds, index=col_names).T
-        spacings = pd.DataFrame(data=spacings, index=col_names).T
-        sqes = pd.DataFrame(data=sqes, index=col_names).T
-        return unfoldeds, spacings, sqes, smoother_map  # type: ignore
+            smoother_map[col_name] = closure
+        return (
+            col_names,
+            _columns_to_array(unfoldeds),
+            _columns_to_array(spacings),
+            np.array(sqes, dtype=np.float64),
+            smoother_map,
+        )
+
+    def __fit_polys(self, degrees: List[int]) -> List[Tuple[ndarray, Callable]]:
+        """Fit polynomials of each degree in `degrees` to the step function, sharing
+        the least-squares work across degrees.
+
+        The leading d + 1 columns of the QR factorization of a Vandermonde matrix are
+        the QR factorization of the degree-d Vandermonde matrix, so a single QR of the
+        max-degree matrix reduces each fit to a triangular solve. Eigenvalues are first
+        mapped to [-1, 1] to keep the Vandermonde matrix well-conditioned. Results
+        agree with `numpy.polynomial.polynomial.polyfit` to floating-point precision.
+        Degrees which are too large for the number of (distinct) eigenvalues, and so
+        are rank-deficient, fall back to `polyfit`.
+
+        Returns
+        -------
+        fits: List[Tuple[ndarray, Callable]]
+            The (unfolded values, fitted polynomial) for each degree.
+        """
+        for degree in degrees:
+            self.__validate_args(smoother="poly", degree=degree)
+        eigs = self._eigs
+        steps = np.arange(0, len(eigs)) + 1
+        center = (eigs[-1] + eigs[0]) / 2
+        half_width = (eigs[-1] - eigs[0]) / 2
+        if half_width == 0:
+            half_width = 1.0
+        x = (eigs - center) / half_width
+        V = np.vander(x, N=max(degrees) + 1, increasing=True)
+        Q, R = np.linalg.qr(V)
+        Qty = Q.T @ steps
+        # R has only min(len(eigs), max(degrees) + 1) rows, and tiny diagonal entries
+        # where the eigenvalues don't determine the higher-degree coefficients
+        R_diag = np.abs(np.diag(R))
+        tol = R_diag.max(initial=0) * max(V.shape) * np.finfo(np.float64).eps
+        fits = []
+        for d in degrees:
+            if d + 1 > len(R_diag) or np.any(R_diag[: d + 1] <= tol):
+                poly_coef = polyfit(x, steps, d)  # warns of the poor conditioning
+            else:
+                poly_coef = solve_triangular(R[: d + 1, : d + 1], Qty[: d + 1])
+            unfolded = polyval(x, poly_coef)
+            fits.append((unfolded, _scaled_poly(poly_coef, center, half_width)))
+        return fits
 
     @staticmethod
     def _get_smoother_names(
@@ -263,42 +404,26 @@ class Smoother:
         + smoother parameters. Otherwise, just return the name for indexing into the report.
         """
 
-        col_names = []
-        if isinstance(poly_degrees, list):
-            for d in poly_degrees:
-                col_names.append(f"poly_{d}")
-        else:
+        if not isinstance(poly_degrees, list):
             raise ValueError("poly_degrees must be a list of int values")
 
         if spline_smooths == "heuristic":
-            for s in DEFAULT_SPLINE_SMOOTHS:
-                if not isinstance(spline_degrees, list):
-                    raise ValueError("spline_degrees must be a list of integer values")
-                for deg in spline_degrees:
-                    col_name = (
-                        f"{_spline_name(deg)}-spline_" "{:1.3f}_heuristic".format(s)
-                    )
-                    col_names.append(col_name)
+            smooths: Union[str, Tuple[float, ...]] = "heuristic"
+            n_smooths = len(DEFAULT_SPLINE_SMOOTHS)
         else:
             try:
-                spline_smooths = list(spline_smooths)  # type: ignore
+                smooths = tuple(spline_smooths)  # type: ignore
             except Exception as e:
                 raise ValueError(f"Error converting `spline_smooths` to list: {e}")
-            if isinstance(spline_smooths, list):
-                for s in spline_smooths:
-                    if not isinstance(spline_degrees, list):
-                        raise ValueError(
-                            "spline_degrees must be a list of integer values"
-                        )
-                    for deg in spline_degrees:
-                        col_name = f"{_spline_name(deg)}-spline_" "{:1.3f}".format(s)
-                        col_names.append(col_name)
-            else:
-                raise ValueError("spline_smooths must be a list of float values")
+            n_smooths = len(smooths)
+        if n_smooths > 0 and not isinstance(spline_degrees, list):
+            raise ValueError("spline_degrees must be a list of integer values")
 
-        if gompertz is True:
-            col_names.append("gompertz")
-        return col_names
+        return list(
+            _smoother_names(
+                tuple(poly_degrees), smooths, tuple(spline_degrees), bool(gompertz)
+            )
+        )
 
     def __validate_args(self, **kwargs: Any) -> None:
         """throw an error if smoother args are in any way invalid"""
@@ -18,6 +18,8 @@ import numpy as np
 import pandas as pd
 
 from numpy import ndarray
+from multiprocess import cpu_count
+from numba import jit
 from pandas import DataFrame
 from pathlib import Path
 from pyod.models.hbos import HBOS
@@ -37,9 +39,21 @@ from empyricalRMT._constants import (
 # from empyricalRMT._eigvals import EigVals
 import empyricalRMT._eigvals as _eigvals
 from empyricalRMT.plot import _plot_trim_iters, PlotMode, PlotResult
-from empyricalRMT.smoother import Smoother, SmoothMethod
+from empyricalRMT.smoother import Smoother, SmoothMethod, _array_to_frame
 from empyricalRMT.unfold import Unfolded
-from empyricalRMT.utils import find_first, find_last
+from empyricalRMT.utils import find_first, find_last, parallel_map
+
+
+# leading columns of the summary report, before the per-smoother columns
+_TRIM_COLS = ["trim_percent", "trim_low", "trim_high"]
+# per-smoother summary report columns, i.e. "{smoother}--{stat}"
+_STAT_COLS = ["mean_spacing", "var_spacing", "msqe", "score"]
+
+_SUMMARY_LEGEND = (
+    "\n<MSQE>: 20% trimmed mean MSQE across unfoldings.\n"
+    "<s>: 20% trimmed mean of mean spacings across unfoldings.\n"
+    "var(s): 20% trimmed mean of spacings variance across unfoldings.\n"
+)
 
 
 class Trimmed(_eigvals.EigVals):
@@ -180,6 +194,7 @@ class TrimReport:
         detrend: bool = False,
         outlier_tol: float = 0.1,
         show_progress: bool = False,
+        cpus: Optional[int] = 1,
     ):
         """Construct a TrimReport.
 
@@ -223,10 +238,20 @@ class TrimReport:
             A float between 0 and 1, and which is passed as the tolerance parameter for
             [HBOS](https://pyod.readthedocs.io/en/latest/pyod.models.html#module-pyod.models.hbos)
             histogram-based outlier detection
+
+        cpus: int
+            Number of processes used to fit the smoothers to the distinct trims. The
+            default of 1 fits serially. If None, uses all available cpus. Only worth
+            raising when there are many trims and smoothers, since starting the
+            process pool is not free.
         """
-        eigenvalues = np.sort(eigenvalues)
+        # one contiguous float64 working copy, that all trims are views into
+        eigenvalues = np.sort(np.asarray(eigenvalues, dtype=np.float64).ravel())
         self._untrimmed: ndarray = eigenvalues
         self._all_unfolds: Optional[List[DataFrame]] = None
+        # {smoother_name: (mean_spacing_idx, var_spacing_idx, score_idx)}, positions
+        # of each smoother's summary columns, set by `__iters_to_dataframe`
+        self._col_index: Dict[str, Tuple[int, int, int]] = {}
 
         self._trim_iters: List[TrimIter] = self.__get_trim_iters(
             tolerance=outlier_tol,
@@ -238,6 +263,7 @@ class TrimReport:
             gompertz=gompertz,
             detrend=detrend,
             show_progress=show_progress,
+            cpus=cpus,
         )
         self._all_unfolds = list(
             map(lambda trim: trim.unfolds, self._trim_iters)  # type: ignore
@@ -262,7 +288,8 @@ class TrimReport:
 
     @property
     def untrimmed(self) -> ndarray:
-        """Returns the class's copy of the original eigenvalues."""
+        """Returns the class's copy of the original eigenvalues. The eigenvalues of
+        each trim are views into this array, so it must not be modified in place."""
         return self._untrimmed
 
     @property
@@ -395,66 +422,62 @@ class TrimReport:
             )
         scores = report.filter(regex=".*score.*").abs()
 
-        # get column names so we don't have to deal with terrible Pandas return types
+        # get column names and values so we don't have to deal with terrible Pandas
+        # return types. Rows of S are trims, columns are smoothers
         score_cols = np.array(scores.columns.to_list())
+        S = scores.to_numpy()
         # gives column names of columns with lowest scores
-        best_smoother_cols = list(scores.abs().min().sort_values()[:3].to_dict().keys())
+        best_smoother_idx = _argsmallest(np.nanmin(S, axis=0))
+        best_smoother_cols = list(score_cols[best_smoother_idx])
         # indices of rows with best scores
-        best_smoother_rows = report[best_smoother_cols].abs().idxmin().to_list()
+        best_smoother_rows = np.nanargmin(S[:, best_smoother_idx], axis=0)
         # best unfolded eigenvalues
         best_smoother_names = [s.replace("--score", "") for s in best_smoother_cols]
         best_unfoldeds = [unfold[best_smoother_names] for unfold in all_unfolds]
 
         # take the mean GOE score across smoothers for each trimming, find the row
         # with the lowest mean score, and call this the "best overall" trim
-        sorted_row_mean_scores = (
-            report.filter(regex="score").abs().mean(axis=1).sort_values()
-        )
-        best_three = list(
-            sorted_row_mean_scores[:3].index
-        )  # get indices of best three rows
+        best_three = _argsmallest(np.nanmean(S, axis=1))  # indices of best three rows
         best_trim_indices = []
-        for i, row_id in enumerate(best_three):
-            best_trim_eigs = np.array(self._trim_iters[row_id].eigs)
-            best_start, best_end = best_trim_eigs[0], best_trim_eigs[-1]
-            best_indices = (
-                list(self._untrimmed).index(best_start),
-                list(self._untrimmed).index(best_end) + 1,
-            )
-            best_trim_indices.append(best_indices)
+        for row_id in best_three:
+            best_trim = self._trim_iters[row_id]
+            best_trim_indices.append((best_trim._start, best_trim._end))
 
-        # construct dict with trim amounts of best overall scoring smoothers
+        # construct dict with trim amounts of best overall scoring smoothers. Each
+        # row of `col_idx` holds the report column positions for one smoother
         best_smoothers: Dict[Union[str, int], str] = {}
-        trim_cols = ["trim_percent", "trim_low", "trim_high"]
-        for i, col in enumerate(best_smoother_cols):
+        trim_idx = [report.columns.get_loc(col) for col in _TRIM_COLS]
+        col_idx = np.array(
+            [trim_idx + list(self._col_index[name]) for name in best_smoother_names],
+            dtype=int,
+        )
+        V = report.to_numpy()
+        best_rows = V[best_smoother_rows[:, None], col_idx]
+        for i, row in enumerate(best_rows):
             min_score_i = best_smoother_rows[i]
-            cols = trim_cols + [
-                col.replace("score", "mean_spacing"),
-                col.replace("score", "var_spacing"),
-                col,
-            ]
+            best = pd.Series(
+                row, index=report.columns[col_idx[i]], name=report.index[min_score_i]
+            )
             if i == 0:
-                best_smoothers["best"] = report[cols].iloc[min_score_i, :]
+                best_smoothers["best"] = best
             elif i == 1:
-                best_smoothers["second"] = report[cols].iloc[min_score_i, :]
+                best_smoothers["second"] = best
             elif i == 2:
-                best_smoothers["third"] = report[cols].iloc[min_score_i, :]
-            best_smoothers[i] = report[cols].iloc[min_score_i, :]
+                best_smoothers["third"] = best
+            best_smoothers[i] = best
 
         # TODO: implement "best" trim
 
-        median_scores = np.array(scores.median())
-        mean_scores = np.array(scores.mean())
+        median_scores = np.nanmedian(S, axis=0)
+        mean_scores = np.nanmean(S, axis=0)
 
         # get most consistent 3 of each
-        best_median_col_idx = np.argsort(median_scores)[:3]
-        best_mean_col_idx = np.argsort(mean_scores)[:3]
+        best_median_col_idx = _argsmallest(median_scores)
+        best_mean_col_idx = _argsmallest(mean_scores)
         top_smoothers_median = set(score_cols[best_median_col_idx])
         top_smoothers_mean = set(score_cols[best_mean_col_idx])
         consistent = list(top_smoothers_mean.intersection(top_smoothers_median))
-        consistent_smoothers = list(
-            map(lambda s: str(s.replace("--score", "")), consistent)
-        )
+        consistent_smoothers = [str(s.replace("--score", "")) for s in consistent]
 
         return best_smoothers, best_unfoldeds, best_trim_indices, consistent_smoothers
 
@@ -502,7 +525,7 @@ class TrimReport:
         if log_info:
             for trim in self._trim_iters:
                 print(trim.summary()[0])
-            print(self._trim_iters[0].summary()[1])  # print legend
+            print(_SUMMARY_LEGEND)
 
         return _plot_trim_iters(
             self._trim_iters, width=width, title=title, mode=mode, outfile=outfile
@@ -536,6 +559,7 @@ class TrimReport:
         max_trim: float = 0.5,
         max_iters: int = 7,
         show_progress: bool = False,
+        cpus: Optional[int] = 1,
         **smoother_kwargs: Any,
     ) -> List[DataFrame]:
         """Helper function to iteratively perform histogram-based outlier detection
@@ -556,6 +580,9 @@ class TrimReport:
         max_iters: int
             Maximum number of iterations (times) to perform HBOS outlier detection.
 
+        cpus: int
+            Number of processes used to fit the distinct trims. If None, use all
+            available cpus.
 
         Returns
         -------
@@ -582,17 +609,43 @@ class TrimReport:
             trim_iters[i] is a DataFrame of the eigenvalues, step function values,
             unfolded values, and inlier/outlier labels at iteration `i`.
         """
-        eigs = np.copy(self._untrimmed)
-        trim_iters = [TrimIter(eigs, eigs, tolerance, **smoother_kwargs)]
+        eigs = self._untrimmed
+        # only outlier detection is needed to find the trims, so defer the (much more
+        # expensive) smoother fits until all trims are known
+        trim_iters = [
+            TrimIter(eigs, 0, len(eigs), tolerance, fit=False, **smoother_kwargs)
+        ]
         for i in range(max_iters):
-            if show_progress:
-                print(f"Completed trim-unfold iteration: {i}.")
-            trim = trim_iters[-1].next_iter()
+            trim = trim_iters[-1].next_iter(fit=False)
             if trim.proportion_removed > max_trim:
                 break
             trim_iters.append(trim)
             if trim.is_all_inliers():
                 break
+
+        # if HBOS finds no outliers, the next trim is identical to the last, so only
+        # fit each distinct trim once. {trim_indices: index of fit}
+        fit_ids: Dict[Tuple[int, int], int] = {}
+        fit_args = []
+        for trim in trim_iters:
+            if trim.trim_indices not in fit_ids:
+                fit_ids[trim.trim_indices] = len(fit_args)
+                fit_args.append((trim.eigs, trim.kwargs))
+
+        # the fits for each trim are independent, so can be done in parallel
+        cpus = min(len(fit_args), cpu_count() if cpus is None else cpus)
+        if cpus > 1:
+            fits = parallel_map(_fit_trim, fit_args, cpus=cpus)
+            if show_progress:
+                print(f"Completed trim-unfold iterations: 0-{len(fits) - 1}.")
+        else:
+            fits = []
+            for i, args in enumerate(fit_args):
+                fits.append(_fit_trim(args))
+                if show_progress:
+                    print(f"Completed trim-unfold iteration: {i}.")
+        for trim in trim_iters:
+            trim._set_fits(fits[fit_ids[trim.trim_indices]])
         return trim_iters
 
     def __iters_to_dataframe(
@@ -642,10 +695,11 @@ class TrimReport:
         )
         height = len(trim_iters)
         # entry for [mean, var, msqe, score] + [trim_percent, trim_low, trim_high]
-        width = len(colnames) * 4 + 3
+        width = len(_TRIM_COLS) + len(colnames) * len(_STAT_COLS)
 
-        # arr will be converted into the final DataFrame
-        arr = np.zeros([height, width], dtype=np.float32)
+        # arr will be converted into the final DataFrame. Fortran order makes each
+        # report column contiguous, matching pandas' column-major block layout
+        arr = np.zeros([height, width], dtype=np.float32, order="F")
         index = []
         for i, trim in enumerate(trim_iters):
             index.append(trim.id)
@@ -654,43 +708,54 @@ class TrimReport:
             arr[i, 1] = trim.lower_percent_removed
             arr[i, 2] = trim.upper_percent_removed
 
-            # get summary stats for each unfolding by smoother
-            for j, col in enumerate(trim.unfolds):
-                unfolded = np.array(trim.unfolds[col])
-                mean, var, score = self.__evaluate_unfolding(unfolded)
-                # arr[i, 0] is trim_percent, [i,1] is lower_trim_percent, etc, up to
-                # arr[i, 2], which has the upper_trim_percent. Thus ultimately 4
-                # additional columns of values per smoother:
-                arr[i, 4 * j + 3] = mean
-                arr[i, 4 * j + 4] = var
-                arr[i, 4 * j + 5] = trim.msqes[col]
-                arr[i, 4 * j + 6] = score
-
-        col_names_final = ["trim_percent", "trim_low", "trim_high"]
+            # get summary stats for all unfoldings (one column per smoother) at once
+            unfolds = trim.unfolds.to_numpy(copy=False)
+            means, vars_, scores = self.__evaluate_unfoldings_batch(unfolds)
+            # arr[i, 0] is trim_percent, [i,1] is lower_trim_percent, etc, up to
+            # arr[i, 2], which has the upper_trim_percent. Thus ultimately 4
+            # additional columns of values per smoother:
+            arr[i, 3::4] = means
+            arr[i, 4::4] = vars_
+            arr[i, 5::4] = trim._msqes
+            arr[i, 6::4] = scores
+
+        col_names_final = list(_TRIM_COLS)
         # much match order added above
         for name in colnames:
-            col_names_final.append(f"{name}--mean_spacing")
-            col_names_final.append(f"{name}--var_spacing")
-            col_names_final.append(f"{name}--msqe")
-            col_names_final.append(f"{name}--score")
-        trim_report = pd.DataFrame(data=arr, columns=col_names_final, index=index)
+            col_names_final.extend([f"{name}--{stat}" for stat in _STAT_COLS])
+        # so the report can be indexed by position rather than label
+        col_pos = {col: j for j, col in enumerate(col_names_final)}
+        self._col_index = {
+            name: (
+                col_pos[f"{name}--mean_spacing"],
+                col_pos[f"{name}--var_spacing"],
+                col_pos[f"{name}--score"],
+            )
+            for name in colnames
+        }
+        trim_report = pd.DataFrame(
+            data=arr, columns=col_names_final, index=index, copy=False
+        )
         return trim_report
 
     @staticmethod
-    def __evaluate_unfolding(unfolded: ndarray) -> Tuple[float, float, float]:
+    def __evaluate_unfoldings_batch(
+        unfolds: ndarray
+    ) -> Tuple[ndarray, ndarray, ndarray]:
         """Calculate a naive unfolding score via comparison to the expected mean and
         variance of the level spacings of GOE matrices. Positive scores indicate
         there is too much variability in the unfolded eigenvalue spacings, negative
         scores indicate too little. Best score is zero.
+
+        `unfolds` is a 2D array with one column of unfolded values per smoother, and
+        the returned means, variances and scores have one entry per column.
         """
-        spacings = unfolded[1:] - unfolded[:-1]
-        mean, var = np.mean(spacings), np.var(spacings, ddof=1)
-        # variance gets weight 1, i.e. mean is 0.05 times as important
-        mean_weight = 0.5
-        mean_norm = (mean - EXPECTED_GOE_MEAN) / EXPECTED_GOE_MEAN
-        var_norm = (var - EXPECTED_GOE_VARIANCE) / EXPECTED_GOE_VARIANCE
-        score = var_norm + mean_weight * mean_norm
-        return mean, var, score
+        n_smoothers = unfolds.shape[1]
+        means = np.empty(n_smoothers, dtype=np.float64)
+        vars_ = np.empty(n_smoothers, dtype=np.float64)
+        scores = np.empty(n_smoothers, dtype=np.float64)
+        _evaluate_unfoldings(unfolds, means, vars_, scores)
+        return means, vars_, scores
 
 
 class TrimIter:
@@ -698,28 +763,92 @@ class TrimIter:
     process"""
 
     def __init__(
-        self, origs: ndarray, eigs: ndarray, outlier_tol: float, **smoother_kwargs: Any
+        self,
+        origs: ndarray,
+        start: int,
+        end: int,
+        outlier_tol: float,
+        fit: bool = True,
+        **smoother_kwargs: Any,
     ):
+        """Construct a TrimIter.
+
+        Parameters
+        ----------
+        origs: ndarray
+            The sorted, untrimmed eigenvalues.
+
+        start: int
+            Index of the first eigenvalue of `origs` kept by this trim.
+
+        end: int
+            Index one past the last eigenvalue of `origs` kept by this trim.
+
+        outlier_tol: float
+            Tolerance passed to HBOS.
+
+        fit: bool
+            If False, skip the smoother fits. They must then be supplied later via
+            `TrimIter._set_fits`.
+        """
         self.origs = origs
+        # trims only ever remove values from the ends of the sorted eigenvalues, so
+        # tracking bounds lets `eigs` be a view rather than a copy of `origs`. Both
+        # are shared by all trims, and so are read-only
+        self._start = start
+        self._end = end
+        eigs = origs[start:end]
         self.eigs = eigs
         self.id = 0
         self.tol = outlier_tol
         self.kwargs = smoother_kwargs
         self.steps = np.arange(1, len(eigs) + 1)
-        self.clusters = np.array(_get_outlier_labels(eigs, tol=outlier_tol))
-        unfolds, spacings, msqes, smoothers = Smoother(eigs).fit_all(**smoother_kwargs)
-        self.unfolds: DataFrame = unfolds
-        self.spacings: DataFrame = spacings
-        self.msqes: DataFrame = msqes
+        self.clusters = _get_outlier_labels(eigs, tol=outlier_tol)
+        # counted once here, since the inlier / outlier counts are queried repeatedly
+        # while iterating, summarizing and plotting
+        self._n_inliers = int(np.count_nonzero(self.clusters == "inlier"))
+        self._inlier_bounds = self.__get_inlier_bounds()
+        if fit:
+            self._set_fits(_fit_trim((eigs, smoother_kwargs)))
+
+    def _set_fits(
+        self, fits: Tuple[List[str], ndarray, ndarray, ndarray, Dict[str, Callable]]
+    ) -> None:
+        """Attach the results of `Smoother._fit_all_arrays`. Only the unfoldings are
+        needed as a DataFrame (for `TrimReport.unfoldings`), so the spacings and msqes
+        DataFrames are only built (once) if requested."""
+        col_names, unfolds, spacings, msqes, smoothers = fits
+        self._col_names = col_names
+        self.unfolds: DataFrame = _array_to_frame(unfolds, col_names)
+        self._spacings: ndarray = spacings
+        self._msqes: ndarray = msqes
+        self._spacings_frame: Optional[DataFrame] = None
+        self._msqes_frame: Optional[DataFrame] = None
         self.smoothers: Dict[str, Callable] = smoothers
+        # 20% trimmed means (across smoothers) of the spacing means and variances,
+        # computed once here since both `summary` and trim plots need them
+        self.mean_spacing = float(trim_mean(np.mean(spacings, axis=0), 0.2))
+        self.var_spacing = float(trim_mean(np.var(spacings, axis=0, ddof=1), 0.2))
+
+    @property
+    def spacings(self) -> DataFrame:
+        if self._spacings_frame is None:
+            self._spacings_frame = _array_to_frame(self._spacings, self._col_names)
+        return self._spacings_frame
+
+    @property
+    def msqes(self) -> DataFrame:
+        if self._msqes_frame is None:
+            self._msqes_frame = _array_to_frame(self._msqes, self._col_names)
+        return self._msqes_frame
 
     @property
     def inlier_length(self) -> int:
-        return int(np.count_nonzero(self.clusters == "inlier"))
+        return self._n_inliers
 
     @property
     def outlier_length(self) -> int:
-        return int(np.count_nonzero(self.clusters == "outlier"))
+        return len(self.eigs) - self._n_inliers
 
     @property
     def proportion_kept(self) -> float:
@@ -735,38 +864,46 @@ class TrimIter:
 
     @property
     def lower_percent_removed(self) -> float:
-        lower_trim_length = find_first(self.origs, self.eigs[0])
+        lower_trim_length = self._start
         return float(np.round(100 * lower_trim_length / len(self.origs), 1))
 
     @property
     def upper_percent_removed(self) -> float:
-        upper_trim_length = len(self.origs) - 1 - find_last(self.origs, self.eigs[-1])
+        upper_trim_length = len(self.origs) - self._end
         return float(np.round(100 * upper_trim_length / len(self.origs), 1))
 
     @property
     def trim_indices(self) -> Tuple[int, int]:
-        start = find_first(self.origs, self.eigs[0])
-        end = find_last(self.origs, self.eigs[-1])
-        return (start, end)
+        return (self._start, self._end - 1)
 
     @property
     def inliers(self) -> ndarray:
-        return np.copy(self.eigs[self.clusters == "inlier"])
+        start, end = self._inlier_bounds
+        return np.copy(self.origs[start:end])
 
     def is_all_inliers(self) -> bool:
-        return bool(np.alltrue(self.clusters == "inlier"))
+        return self._n_inliers == len(self.eigs)
 
-    def next_iter(self) -> "TrimIter":
-        trim = TrimIter(self.origs, self.inliers, self.tol, **self.kwargs)
+    def next_iter(self, fit: bool = True) -> "TrimIter":
+        start, end = self._inlier_bounds
+        trim = TrimIter(self.origs, start, end, self.tol, fit=fit, **self.kwargs)
         trim.id = self.id + 1
         return trim
 
+    def __get_inlier_bounds(self) -> Tuple[int, int]:
+        """Get the bounds, into `self.origs`, of the inliers. The outliers found by
+        `_get_outlier_labels` are always at one end of `self.eigs`, so the inliers
+        are contiguous, and the bounds follow from the outlier count alone."""
+        n_outliers = len(self.eigs) - self._n_inliers
+        if n_outliers > 0 and self.clusters.codes[0] == 1:  # outliers at start
+            return (self._start + n_outliers, self._end)
+        return (self._start, self._end - n_outliers)
+
     def summary(self) -> Tuple[str, str]:
         percent = self.percent_removed
         start, end = self.trim_indices
-        mean = float(trim_mean(self.spacings.mean(), 0.2))
-        var = float(trim_mean(self.spacings.var(ddof=1), 0.2))
-        mmsqe = float(trim_mean(self.msqes, 0.2, axis=1))
+        mean, var = self.mean_spacing, self.var_spacing
+        mmsqe = float(trim_mean(self._msqes, 0.2))
         iter_info = "Iteration {:d}:".format(self.id)
         trim_info = "{:4.1f}% trimmed - Trim indices: ({:d},{:d})".format(
             percent, start, end
@@ -774,33 +911,89 @@ class TrimIter:
         fit_info = "<s> = {:1.6f}, var(s) = {:04.5f}, <MSQE>: {:5.5f}.".format(
             mean, var, mmsqe
         )
-        legend = (
-            "\n<MSQE>: 20% trimmed mean MSQE across unfoldings.\n"
-            "<s>: 20% trimmed mean of mean spacings across unfoldings.\n"
-            "var(s): 20% trimmed mean of spacings variance across unfoldings.\n"
-        )
-        return f"{iter_info} {trim_info} - {fit_info}", legend
-
-
-def _get_outlier_labels(eigs: ndarray, tol: float) -> List[str]:
-    """Identify the outliers of eigs with HBOS."""
+        return f"{iter_info} {trim_info} - {fit_info}", _SUMMARY_LEGEND
+
+
+# no fastmath, so that the NaNs of too-short trims propagate as they do in numpy
+@jit(nopython=True, cache=True)
+def _evaluate_unfoldings(
+    unfolds: ndarray, means: ndarray, vars_: ndarray, scores: ndarray
+) -> None:
+    """Compute the spacing mean, spacing variance, and GOE score of each column of
+    `unfolds`, writing them into `means`, `vars_`, and `scores`, respectively. Avoids
+    allocating the spacings. Like `np.mean` and `np.var(ddof=1)`, the mean is NaN
+    for fewer than one spacing, and the variance for fewer than two."""
+    n = unfolds.shape[0] - 1  # number of spacings
+    # variance gets weight 1, i.e. mean is half as important
+    mean_weight = 0.5
+    for j in range(unfolds.shape[1]):
+        mean = np.nan
+        var = np.nan
+        if n >= 1:
+            # sum of spacings telescopes
+            mean = (unfolds[n, j] - unfolds[0, j]) / n
+        if n >= 2:
+            ssq = 0.0
+            for i in range(n):
+                dev = unfolds[i + 1, j] - unfolds[i, j] - mean
+                ssq += dev * dev
+            var = ssq / (n - 1)
+        mean_norm = (mean - EXPECTED_GOE_MEAN) / EXPECTED_GOE_MEAN
+        var_norm = (var - EXPECTED_GOE_VARIANCE) / EXPECTED_GOE_VARIANCE
+        means[j] = mean
+        vars_[j] = var
+        scores[j] = var_norm + mean_weight * mean_norm
+
+
+def _argsmallest(values: ndarray, k: int = 3) -> ndarray:
+    """Get the indices of the (at most) `k` smallest values, in ascending order of
+    value. Only the `k` smallest values are sorted, rather than all of `values`.
+    Like `pd.Series.sort_values`, NaNs sort last and ties keep their order."""
+    idx = np.arange(len(values))
+    if len(values) > k:
+        kth = np.partition(values, k - 1)[k - 1]
+        if not np.isnan(kth):
+            # keep every value tied with the kth smallest, so that ties at the
+            # boundary are broken by position, rather than by the partition
+            with np.errstate(invalid="ignore"):  # NaNs compare False
+                idx = np.flatnonzero(values <= kth)
+    return idx[np.argsort(values[idx], kind="mergesort")][:k]
+
+
+def _fit_trim(
+    args: Tuple[ndarray, Dict[str, Any]]
+) -> Tuple[List[str], ndarray, ndarray, ndarray, Dict[str, Callable]]:
+    """Fit all smoothers to a trim. Takes a single (eigs, smoother_kwargs) tuple
+    argument so that it can be used with `parallel_map`."""
+    eigs, smoother_kwargs = args
+    return Smoother(eigs)._fit_all_arrays(**smoother_kwargs)
+
+
+def _get_outlier_labels(eigs: ndarray, tol: float) -> pd.Categorical:
+    """Identify the outliers of eigs with HBOS. Labels are returned as a Categorical
+    with categories ["inlier", "outlier"]."""
     hb = HBOS(tol=tol)
-    steps = np.arange(0, len(eigs))
-    X = np.vstack([eigs, steps]).T  # data array
+    # fill a C-contiguous data array directly instead of vstack-ing and transposing.
+    # NOTE: don't use float32 here. HBOS scores are heavily tied, and the tiny
+    # rounding changes are enough to flip entire histogram bins across the outlier
+    # threshold
+    X = np.empty([len(eigs), 2], dtype=np.float64)
+    X[:, 0] = eigs
+    X[:, 1] = np.arange(0, len(eigs))  # steps
     is_outlier = np.array(hb.fit(X).labels_, dtype=bool)  # outliers get "1"
 
     # because eigs are sorted, HBOS will *usually* identify outliers at one of
     # the two ends of the eigenvalues, which is what we want. But this is not
     # always the case, so we need to de-identify those values as outliers.
     if is_outlier[0]:
-        start = find_first(is_outlier, False)
-        for i in range(start, len(is_outlier)):
-            is_outlier[i] = False
+        start = find_first(is_outlier, False)  # -1 if all are outliers
+        is_outlier[max(start, 0) :] = False
     if is_outlier[-1]:
         stop = find_last(is_outlier, False)
-        for i in range(stop):
-            is_outlier[i] = False
+        is_outlier[: max(stop, 0)] = False
     if not is_outlier[0] and not is_outlier[-1]:  # force a break later
         is_outlier = np.zeros(is_outlier.shape, dtype=bool)
 
-    return ["outlier" if label else "inlier" for label in is_outlier]
+    return pd.Categorical.from_codes(
+        is_outlier.view(np.int8), categories=["inlier", "outlier"]
+    )
@@ -2,6 +2,9 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from numpy.polynomial.polyutils import RankWarning
+from numpy.polynomial.polynomial import polyfit, polyval
+
 from empyricalRMT.smoother import Smoother
 from empyricalRMT.construct import generate_eigs
 
@@ -21,3 +24,60 @@ def test_smoother_class() -> None:
     with pytest.raises(ValueError):
         eigs = np.array([[1, 2, 3], [4, 5, 6]])
         smoother = Smoother(eigs)
+
+
+@pytest.mark.fast
+def test_poly_fits() -> None:
+    eigs = np.sort(generate_eigs(500, seed=1))
+    steps = np.arange(0, len(eigs)) + 1
+    degrees = [3, 5, 7, 9, 11]
+    unfoldeds, _, _, closures = Smoother(eigs).fit_all(poly_degrees=degrees)
+    x = np.linspace(eigs[0], eigs[-1], 100)
+    for d in degrees:
+        poly_coef = polyfit(eigs, steps, d)
+        expected = np.sort(polyval(eigs, poly_coef))
+        assert np.allclose(unfoldeds[f"poly_{d}"], expected, rtol=1e-8, atol=1e-8)
+        assert np.allclose(
+            closures[f"poly_{d}"](x), polyval(x, poly_coef), rtol=1e-8, atol=1e-8
+        )
+        # `fit` and `fit_all` use the same fitting procedure
+        unfolded, _, closure = Smoother(eigs).fit(degree=d, return_callable=True)
+        assert np.allclose(np.sort(unfolded), unfoldeds[f"poly_{d}"], rtol=1e-12)
+        assert np.allclose(closure(x), closures[f"poly_{d}"](x), rtol=1e-12)
+
+    # too few eigenvalues for the degree still gives a fit, as with polyfit
+    with pytest.warns(RankWarning):
+        unfoldeds, _, _, _ = Smoother(eigs[:5]).fit_all(poly_degrees=[3, 7])
+    assert np.all(np.isfinite(unfoldeds.to_numpy()))
+
+
+@pytest.mark.fast
+def test_smoother_names() -> None:
+    eigs = np.sort(generate_eigs(500, seed=1))
+    for spline_smooths in ["heuristic", [1.25, 1.5, 2.0]]:
+        kwargs = dict(
+            poly_degrees=[3, 5],
+            spline_smooths=spline_smooths,
+            spline_degrees=[3, 4],
+            gompertz=True,
+        )
+        unfoldeds, spacings, sqes, closures = Smoother(eigs).fit_all(**kwargs)
+        names = Smoother._get_smoother_names(**kwargs)
+        assert list(unfoldeds.columns) == names
+        assert list(spacings.columns) == names
+        assert list(sqes.columns) == names
+        assert list(closures.keys()) == names
+    # truthy non-bool gompertz flags still fit (and name) the gompertz curve
+    for gompertz in [np.bool_(True), 1]:
+        unfoldeds, _, _, closures = Smoother(eigs).fit_all(
+            poly_degrees=[3], gompertz=gompertz
+        )
+        assert list(unfoldeds.columns) == ["poly_3", "gompertz"]
+        assert list(closures.keys()) == ["poly_3", "gompertz"]
+        assert Smoother._get_smoother_names(
+            poly_degrees=[3], spline_smooths=[], gompertz=gompertz
+        ) == ["poly_3", "gompertz"]
+    # heuristic smoothing exponents need three decimals to be told apart
+    assert "cubic-spline_0.717_heuristic" in Smoother._get_smoother_names(
+        poly_degrees=[], spline_smooths="heuristic", spline_degrees=[3]
+    )
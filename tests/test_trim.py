@@ -1,12 +1,17 @@
 import numpy as np
 import pandas as pd
 import pytest
+import warnings
 
 from pathlib import Path
+from typing import Any
+
+import empyricalRMT.trim as trim_module
 
 from empyricalRMT.eigenvalues import Eigenvalues
 from empyricalRMT.construct import generate_eigs
-from empyricalRMT.trim import TrimIter
+from empyricalRMT._constants import EXPECTED_GOE_MEAN, EXPECTED_GOE_VARIANCE
+from empyricalRMT.trim import TrimIter, TrimReport, _argsmallest, _evaluate_unfoldings
 
 
 @pytest.mark.fast
@@ -57,3 +62,113 @@ def test_trim_reports() -> None:
     assert np.array_equal(best_indices, [(104, 1765), (231, 1765), (104, 2000)])
 
     report.plot_trim_steps(mode="test")
+
+
+@pytest.mark.fast
+@pytest.mark.trim
+def test_argsmallest() -> None:
+    def old_argsmallest(values: np.ndarray) -> np.ndarray:
+        return np.array(pd.Series(values).sort_values()[:3].index, dtype=int)
+
+    # k >= len
+    for values in [np.array([]), np.array([2.0]), np.array([3.0, 1.0, 2.0])]:
+        assert np.array_equal(_argsmallest(values), old_argsmallest(values))
+    assert np.array_equal(_argsmallest(np.array([3.0, 1.0]), k=5), [1, 0])
+
+    # NaN entries sort last, including when there are fewer than k non-NaNs
+    values = np.array([np.nan, 4.0, 1.0, np.nan, 3.0, 2.0])
+    assert np.array_equal(_argsmallest(values), old_argsmallest(values))
+    values = np.array([np.nan, 4.0, np.nan, np.nan, 1.0])
+    assert np.array_equal(_argsmallest(values), old_argsmallest(values))
+
+    # ties, including ties straddling the kth smallest value
+    for values in [
+        np.array([1.0, 1.0, 1.0, 1.0, 0.0]),
+        np.array([2.0, 0.0, 2.0, 1.0, 2.0, 2.0, 3.0]),
+        np.array([5.0, 5.0, 5.0, 5.0, 5.0, 5.0]),
+    ]:
+        assert np.array_equal(_argsmallest(values), old_argsmallest(values))
+
+    rng = np.random.RandomState(1)
+    for _ in range(100):
+        values = rng.randint(0, 5, size=rng.randint(1, 15)).astype(np.float64)
+        values[rng.uniform(size=len(values)) < 0.2] = np.nan
+        assert np.array_equal(_argsmallest(values), old_argsmallest(values))
+
+
+@pytest.mark.fast
+@pytest.mark.trim
+def test_evaluate_unfoldings() -> None:
+    rng = np.random.RandomState(3)
+    # includes trims too short to have a spacing, or a spacing variance
+    for n_rows in [0, 1, 2, 3, 10, 500]:
+        unfolds = np.cumsum(rng.exponential(size=(n_rows, 5)), axis=0)
+        means = np.empty(5)
+        vars_ = np.empty(5)
+        scores = np.empty(5)
+        _evaluate_unfoldings(unfolds, means, vars_, scores)
+        with warnings.catch_warnings():  # numpy warns about too few spacings
+            warnings.simplefilter("ignore", RuntimeWarning)
+            spacings = np.diff(unfolds, axis=0)
+            exp_means = np.mean(spacings, axis=0)
+            exp_vars = np.var(spacings, axis=0, ddof=1)
+        var_norm = (exp_vars - EXPECTED_GOE_VARIANCE) / EXPECTED_GOE_VARIANCE
+        mean_norm = (exp_means - EXPECTED_GOE_MEAN) / EXPECTED_GOE_MEAN
+        exp_scores = var_norm + 0.5 * mean_norm
+        assert np.allclose(means, exp_means, equal_nan=True)
+        assert np.allclose(vars_, exp_vars, equal_nan=True)
+        assert np.allclose(scores, exp_scores, equal_nan=True)
+
+
+@pytest.mark.fast
+@pytest.mark.trim
+def test_trim_iter_kwargs() -> None:
+    eigs = np.sort(generate_eigs(500, seed=1))
+    # smoother kwargs are optional, and default as in `Smoother.fit_all`
+    trim = TrimIter(eigs, 0, len(eigs), 0.1, poly_degrees=[3, 5])
+    assert list(trim.unfolds.columns) == ["poly_3", "poly_5"]
+    assert list(trim.spacings.columns) == ["poly_3", "poly_5"]
+    assert trim.msqes.shape == (1, 2)
+    trim = TrimIter(eigs, 0, len(eigs), 0.1, gompertz=True)
+    assert list(trim.unfolds.columns) == ["gompertz"]
+
+
+@pytest.mark.fast
+@pytest.mark.trim
+def test_trim_report_parallel() -> None:
+    eigs = Eigenvalues(generate_eigs(1000, seed=2))
+    kwargs = dict(max_iters=4, poly_degrees=[3, 5, 7], gompertz=True)
+    serial = eigs.trim_report(cpus=1, **kwargs)
+    assert len(set(serial.trim_indices)) > 1  # so that a pool has work to split
+    for cpus in [2, None]:
+        report = eigs.trim_report(cpus=cpus, **kwargs)
+        pd.testing.assert_frame_equal(report.summary, serial.summary)
+        # the closures survive being pickled back from the worker processes
+        for trim, serial_trim in zip(report._trim_iters, serial._trim_iters):
+            x = trim.eigs
+            for name, closure in trim.smoothers.items():
+                assert callable(closure)
+                assert np.allclose(closure(x), serial_trim.smoothers[name](x))
+
+
+@pytest.mark.fast
+@pytest.mark.trim
+def test_trim_report_fits_identical_trims_once(monkeypatch: Any) -> None:
+    calls = []
+    fit_trim = trim_module._fit_trim
+
+    def counting_fit_trim(args: Any) -> Any:
+        calls.append(args)
+        return fit_trim(args)
+
+    monkeypatch.setattr(trim_module, "_fit_trim", counting_fit_trim)
+    # HBOS finds no outliers in evenly-spaced values, so the first two trims are
+    # identical, and iteration stops there
+    eigs = np.linspace(-1, 1, 500)
+    report = TrimReport(eigs, max_iters=4, poly_degrees=[3, 5], gompertz=False)
+    assert report.trim_indices == [(0, 499), (0, 499)]
+    assert len(calls) == 1
+    summary = report.summary.to_numpy()
+    assert np.array_equal(summary[0], summary[1])
+    first, second = report._trim_iters
+    assert first.unfolds.equals(second.unfolds)